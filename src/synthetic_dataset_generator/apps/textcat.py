@@ -1,6 +1,7 @@
 import json
 import random
 import uuid
+from concurrent.futures import ThreadPoolExecutor
 from typing import List, Union
 
 import argilla as rg
@@ -19,7 +20,10 @@ from synthetic_dataset_generator.apps.base import (
     validate_argilla_user_workspace_dataset,
     validate_push_to_hub,
 )
-from synthetic_dataset_generator.constants import DEFAULT_BATCH_SIZE
+from synthetic_dataset_generator.constants import (
+    DEFAULT_BATCH_SIZE,
+    EXAMPLES_PER_PROMPT,
+)
 from synthetic_dataset_generator.pipelines.embeddings import (
     get_embeddings,
     get_sentence_embedding_dimensions,
@@ -30,6 +34,7 @@ from synthetic_dataset_generator.pipelines.textcat import (
     get_labeller_generator,
     get_prompt_generator,
     get_textcat_generator,
+    warmup_prompt_generator,
 )
 from synthetic_dataset_generator.utils import (
     get_argilla_client,
@@ -103,6 +108,7 @@ def generate_dataset(
         clarity=clarity,
         temperature=temperature,
         is_sample=is_sample,
+        examples_per_prompt=EXAMPLES_PER_PROMPT,
     )
     updated_system_prompt = f"{system_prompt}. Optional labels: {', '.join(labels)}."
     if multi_label:
@@ -115,55 +121,66 @@ def generate_dataset(
     total_steps: int = num_rows * 2
     batch_size = DEFAULT_BATCH_SIZE
 
-    # create text classification data
+    # create text classification data, labelling each batch in a background thread
+    # while the next one is being generated
     n_processed = 0
-    textcat_results = []
-    while n_processed < num_rows:
-        progress(
-            2 * 0.5 * n_processed / num_rows,
-            total=total_steps,
-            desc="(1/2) Generating dataset",
-        )
-        remaining_rows = num_rows - n_processed
-        batch_size = min(batch_size, remaining_rows)
-        inputs = []
-        for _ in range(batch_size):
-            if multi_label:
-                num_labels = len(labels)
-                k = int(
-                    random.betavariate(alpha=(num_labels - 1), beta=num_labels)
-                    * num_labels
+    labeller_batches = []
+    executor = ThreadPoolExecutor(max_workers=1)
+    # NOTE: pending labelling jobs are cancelled if a batch fails, so that they don't
+    # keep calling the API for a request that has already failed
+    try:
+        while n_processed < num_rows:
+            progress(
+                2 * 0.5 * n_processed / num_rows,
+                total=total_steps,
+                desc="(1/2) Generating dataset",
+            )
+            remaining_rows = num_rows - n_processed
+            batch_size = min(batch_size, remaining_rows)
+            inputs = []
+            for _ in range(batch_size):
+                if multi_label:
+                    num_labels = len(labels)
+                    k = int(
+                        random.betavariate(alpha=(num_labels - 1), beta=num_labels)
+                        * num_labels
+                    )
+                else:
+                    k = 1
+
+                sampled_labels = random.sample(labels, min(k, len(labels)))
+                random.shuffle(sampled_labels)
+                inputs.append(
+                    {
+                        "task": f"{system_prompt}. The text represents the following categories: {', '.join(sampled_labels)}"
+                    }
+                )
+            batch = list(textcat_generator.process(inputs=inputs))
+            for result in batch[0]:
+                result["text"] = result["input_text"]
+            labeller_batches.append(
+                executor.submit(
+                    lambda batch: list(labeller_generator.process(inputs=batch)),
+                    batch[0],
                 )
-            else:
-                k = 1
-
-            sampled_labels = random.sample(labels, min(k, len(labels)))
-            random.shuffle(sampled_labels)
-            inputs.append(
-                {
-                    "task": f"{system_prompt}. The text represents the following categories: {', '.join(sampled_labels)}"
-                }
             )
-        batch = list(textcat_generator.process(inputs=inputs))
-        textcat_results.extend(batch[0])
-        n_processed += batch_size
-    for result in textcat_results:
-        result["text"] = result["input_text"]
-
-    # label text classification data
-    progress(2 * 0.5, desc="(2/2) Labeling dataset")
-    n_processed = 0
-    labeller_results = []
-    while n_processed < num_rows:
-        progress(
-            0.5 + 0.5 * n_processed / num_rows,
-            total=total_steps,
-            desc="(2/2) Labeling dataset",
-        )
-        batch = textcat_results[n_processed : n_processed + batch_size]
-        labels_batch = list(labeller_generator.process(inputs=batch))
-        labeller_results.extend(labels_batch[0])
-        n_processed += batch_size
+            n_processed += batch_size
+
+        # label text classification data
+        progress(2 * 0.5, desc="(2/2) Labeling dataset")
+        n_processed = 0
+        labeller_results = []
+        for labels_batch in labeller_batches:
+            progress(
+                0.5 + 0.5 * n_processed / num_rows,
+                total=total_steps,
+                desc="(2/2) Labeling dataset",
+            )
+            labels_batch = labels_batch.result()
+            labeller_results.extend(labels_batch[0])
+            n_processed += len(labels_batch[0])
+    finally:
+        executor.shutdown(cancel_futures=True)
     progress(
         1,
         total=total_steps,
@@ -647,3 +664,4 @@ with gr.Blocks() as app:
 
     app.load(fn=swap_visibility, outputs=main_ui)
     app.load(fn=get_org_dropdown, outputs=[org_name])
+    app.load(fn=warmup_prompt_generator)
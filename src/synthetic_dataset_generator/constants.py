@@ -18,6 +18,9 @@ if not HF_TOKEN:
 MAX_NUM_TOKENS = int(os.getenv("MAX_NUM_TOKENS", 2048))
 MAX_NUM_ROWS: str | int = int(os.getenv("MAX_NUM_ROWS", 1000))
 DEFAULT_BATCH_SIZE = int(os.getenv("DEFAULT_BATCH_SIZE", 5))
+EXAMPLES_PER_PROMPT = int(os.getenv("EXAMPLES_PER_PROMPT", 1))
+MAX_CONNECTIONS = int(os.getenv("MAX_CONNECTIONS", 2048))
+MAX_PARALLEL_REQUESTS = int(os.getenv("MAX_PARALLEL_REQUESTS", 16))
 MODEL = os.getenv("MODEL", "meta-llama/Meta-Llama-3.1-8B-Instruct")
 BASE_URL = os.getenv("BASE_URL", default=None)
 
@@ -63,6 +66,9 @@ if not SFT_AVAILABLE:
     )
     MAGPIE_PRE_QUERY_TEMPLATE = None
 
+# Cache
+CACHE_DIR = os.getenv("CACHE_DIR", default="")
+
 # Embeddings
 STATIC_EMBEDDING_MODEL = "minishlab/potion-base-8M"
 
@@ -1,10 +1,100 @@
-from synthetic_dataset_generator.constants import API_KEYS
+import asyncio
+import itertools
+import threading
 
-TOKEN_INDEX = 0
+import httpx
+from distilabel.llms import InferenceEndpointsLLM, OpenAILLM
+from openai import DefaultAsyncHttpxClient
+
+from synthetic_dataset_generator.constants import (
+    API_KEYS,
+    MAX_CONNECTIONS,
+    MAX_PARALLEL_REQUESTS,
+)
+
+_API_KEYS = itertools.cycle(API_KEYS)
+
+_EVENT_LOOP = None
+_EVENT_LOOP_LOCK = threading.Lock()
+_SEMAPHORE = asyncio.Semaphore(MAX_PARALLEL_REQUESTS)
+
+_HTTP_CLIENT = DefaultAsyncHttpxClient(
+    limits=httpx.Limits(
+        max_connections=MAX_CONNECTIONS,
+        max_keepalive_connections=MAX_CONNECTIONS // 2,
+    ),
+)
 
 
 def _get_next_api_key():
-    global TOKEN_INDEX
-    api_key = API_KEYS[TOKEN_INDEX % len(API_KEYS)]
-    TOKEN_INDEX += 1
-    return api_key
+    return next(_API_KEYS)
+
+
+def _get_event_loop() -> asyncio.AbstractEventLoop:
+    """Returns the event loop shared by all the LLMs, running it in a daemon thread
+    the first time it is requested."""
+    global _EVENT_LOOP
+    with _EVENT_LOOP_LOCK:
+        if _EVENT_LOOP is None:
+            _EVENT_LOOP = asyncio.new_event_loop()
+            threading.Thread(
+                target=_EVENT_LOOP.run_forever,
+                name="synthetic-dataset-generator-event-loop",
+                daemon=True,
+            ).start()
+    return _EVENT_LOOP
+
+
+class SharedLoopMixin:
+    """Mixin for `AsyncLLM`s that runs their generations on the shared event loop,
+    instead of creating and blocking on a new event loop per `LLM` instance, so that
+    requests coming from different Gradio workers overlap. At most
+    `MAX_PARALLEL_REQUESTS` requests are in flight across all the LLMs."""
+
+    def generate(self, inputs, num_generations=1, **kwargs):
+        future = asyncio.run_coroutine_threadsafe(
+            self._agenerate(inputs=inputs, num_generations=num_generations, **kwargs),
+            _get_event_loop(),
+        )
+        return future.result()
+
+    async def agenerate(self, *args, **kwargs):
+        # NOTE: the permit is taken per `agenerate` call, as LLMs that don't support
+        # `num_generations` send one request per generation
+        async with _SEMAPHORE:
+            return await super().agenerate(*args, **kwargs)
+
+
+class SharedLoopInferenceEndpointsLLM(SharedLoopMixin, InferenceEndpointsLLM):
+    """`InferenceEndpointsLLM` that runs its generations on the shared event loop."""
+
+
+class PooledOpenAILLM(SharedLoopMixin, OpenAILLM):
+    """`OpenAILLM` that runs its generations on the shared event loop, and whose
+    `AsyncOpenAI` client uses `_HTTP_CLIENT`, so the connections are pooled across the
+    generators and kept alive between requests."""
+
+    def load(self) -> None:
+        # NOTE: the structured output is applied after swapping the HTTP client, as
+        # `OpenAILLM.load` would otherwise wrap the default client with instructor
+        structured_output, self.structured_output = self.structured_output, None
+        try:
+            super().load()
+        finally:
+            self.structured_output = structured_output
+
+        # NOTE: `OpenAILLM.load` still creates an `AsyncOpenAI` client with its own
+        # connection pool, which is thrown away here without having opened any
+        # connection
+        self._aclient = self._aclient.with_options(http_client=_HTTP_CLIENT)
+
+        if self.structured_output:
+            result = self._prepare_structured_output(
+                structured_output=self.structured_output,
+                client=self._aclient,
+                framework="openai",
+            )
+            self._aclient = result.get("client")
+            if structured_output := result.get("structured_output"):
+                self.structured_output = structured_output
+
@@ -1,16 +1,36 @@
+import hashlib
+import json
+import os
 import random
-from typing import List
-
-from distilabel.llms import InferenceEndpointsLLM, OpenAILLM
+import re
+import sqlite3
+import threading
+import warnings
+from contextlib import closing
+from functools import lru_cache
+from typing import List, Union
+
+from distilabel.steps import StepInput, StepOutput
 from distilabel.steps.tasks import (
     GenerateTextClassificationData,
     TextClassification,
     TextGeneration,
 )
-from pydantic import BaseModel, Field
-
-from synthetic_dataset_generator.constants import BASE_URL, MAX_NUM_TOKENS, MODEL
-from synthetic_dataset_generator.pipelines.base import _get_next_api_key
+from distilabel.steps.tasks.base import DISTILABEL_METADATA_KEY
+from jinja2 import Template
+from pydantic import BaseModel, Field, PositiveInt, PrivateAttr
+
+from synthetic_dataset_generator.constants import (
+    BASE_URL,
+    CACHE_DIR,
+    MAX_NUM_TOKENS,
+    MODEL,
+)
+from synthetic_dataset_generator.pipelines.base import (
+    PooledOpenAILLM,
+    SharedLoopInferenceEndpointsLLM,
+    _get_next_api_key,
+)
 from synthetic_dataset_generator.utils import get_preprocess_labels
 
 PROMPT_CREATION_PROMPT = """You are an AI assistant specialized in generating very precise text classification tasks for dataset creation.
@@ -45,6 +65,136 @@ DEFAULT_DATASET_DESCRIPTIONS = [
     "A dataset covering news articles about various topics.",
 ]
 
+BATCHED_TEXTCAT_PROMPT = Template(
+    """You have been assigned the following text classification tasks:
+{% for task in tasks %}
+{{ loop.index }}. {{ task.task }}
+   The "input_text" is {{ task.clarity }} and requires {{ task.difficulty }} level education to comprehend.
+{%- endfor %}
+
+Your mission is to write one text classification example for each of the tasks, in the same order, in JSON format. Respond with a JSON object with the key "examples" containing a list of {{ tasks | length }} JSON objects. Each of the JSON objects must contain the following keys:
+ - "input_text": a string, the input text specified by the classification task.
+ - "label": a string, the correct label of the input text.
+ - "misleading_label": a string, an incorrect label that is related to the task.
+
+Please adhere to the following guidelines:
+ - The "input_text" should be diverse in expression.
+ - The "misleading_label" must be a valid label for the given task, but not as appropriate as the "label" for the "input_text".
+ - The values for all fields should be in {{ language }}.
+ - Avoid including the values of the "label" and "misleading_label" fields in the "input_text", that would make the task too easy.
+ - The "input_text" of each example must have the clarity and education level given for its task.
+
+Your output must always be a JSON object only, do not explain yourself or output anything else. Be creative!"""
+)
+
+_PIPELINE_CODE_IMPORTS = """
+# Requirements: `pip install distilabel[hf-inference-endpoints]`
+import os
+import random
+from distilabel.llms import InferenceEndpointsLLM
+from distilabel.pipeline import Pipeline
+from distilabel.steps import LoadDataFromDicts, KeepColumns
+from distilabel.steps.tasks import """
+
+_PIPELINE_CODE_HEADER = f"""
+
+MODEL = "{MODEL}"
+BASE_URL = "{BASE_URL}"
+"""
+
+_PIPELINE_CODE_MODEL_ARG = "model_id" if BASE_URL else "model"
+_PIPELINE_CODE_MODEL_CLASS = "InferenceEndpointsLLM" if BASE_URL else "OpenAILLM"
+
+_PIPELINE_CODE_GENERATION = """TEXT_CLASSIFICATION_TASK = "{{ system_prompt }}"
+os.environ["API_KEY"] = (
+    "hf_xxx"  # https://huggingface.co/settings/tokens/new?ownUserPermissions=repo.content.read&ownUserPermissions=repo.write&globalPermissions=inference.serverless.write&canReadGatedRepos=true&tokenType=fineGrained
+)
+
+with Pipeline(name="textcat") as pipeline:
+
+    task_generator = LoadDataFromDicts(data=[{"task": TEXT_CLASSIFICATION_TASK}])
+
+    textcat_generation = GenerateTextClassificationData(
+        llm={{ MODEL_CLASS }}(
+            {{ MODEL_ARG }}=MODEL,
+            base_url=BASE_URL,
+            api_key=os.environ["API_KEY"],
+            generation_kwargs={
+                "temperature": {{ temperature }},
+                "max_new_tokens": {{ MAX_NUM_TOKENS }},
+                "top_p": 0.95,
+            },
+        ),
+        seed=random.randint(0, 2**32 - 1),
+        difficulty={{ difficulty }},
+        clarity={{ clarity }},
+        num_generations={{ num_rows }},
+        output_mappings={"input_text": "text"},
+    )
+    """
+
+SINGLE_LABEL_PIPELINE_CODE_TEMPLATE = Template(
+    _PIPELINE_CODE_IMPORTS
+    + "GenerateTextClassificationData"
+    + _PIPELINE_CODE_HEADER
+    + _PIPELINE_CODE_GENERATION
+    + """
+    keep_columns = KeepColumns(
+        columns=["text", "label"],
+    )
+
+    # Connect steps in the pipeline
+    task_generator >> textcat_generation >> keep_columns
+
+    if __name__ == "__main__":
+        distiset = pipeline.run()
+    """
+)
+
+MULTI_LABEL_PIPELINE_CODE_TEMPLATE = Template(
+    _PIPELINE_CODE_IMPORTS
+    + "GenerateTextClassificationData, TextClassification"
+    + _PIPELINE_CODE_HEADER
+    + _PIPELINE_CODE_GENERATION
+    + """
+    keep_columns = KeepColumns(
+        columns=["text"],
+    )
+
+    textcat_labeller = TextClassification(
+        llm={{ MODEL_CLASS }}(
+            {{ MODEL_ARG }}=MODEL,
+            base_url=BASE_URL,
+            api_key=os.environ["API_KEY"],
+            generation_kwargs={
+                "temperature": 0.8,
+                "max_new_tokens": {{ MAX_NUM_TOKENS }},
+            },
+        ),
+        n={{ num_labels }},
+        available_labels={{ labels }},
+        context=TEXT_CLASSIFICATION_TASK,
+        default_label="unknown"
+    )
+
+    # Connect steps in the pipeline
+    task_generator >> textcat_generation >> keep_columns >> textcat_labeller
+
+    if __name__ == "__main__":
+        distiset = pipeline.run()
+    """
+)
+
+_JSON_CODE_BLOCK_PATTERN = re.compile(r"```(?:json)?\s*(.*?)\s*```", re.DOTALL)
+
+_LABELS_CACHE_PATH = os.path.join(CACHE_DIR, "textcat.db") if CACHE_DIR else None
+
+_PROMPT_GENERATOR_WARMUP = None
+_PROMPT_GENERATOR_WARMUP_API_KEY = None
+_PROMPT_GENERATOR_WARMUP_PENDING = False
+_PROMPT_GENERATOR_WARMUP_LOCK = threading.Lock()
+_PROMPT_GENERATOR_WARMUP_TIMEOUT = 30
+
 
 class TextClassificationTask(BaseModel):
     classification_task: str = Field(
@@ -53,34 +203,266 @@ class TextClassificationTask(BaseModel):
         description="The classification task to be performed.",
     )
 
-    labels: list[str] = Field(
+    labels: tuple[str, ...] = Field(
         ...,
         title="Labels",
         description="The possible labels for the classification task.",
     )
 
 
+# NOTE: generated once, as `InferenceEndpointsLLM` would otherwise call
+# `model_json_schema` on the pydantic model for every generation
+TEXTCAT_TASK_SCHEMA = TextClassificationTask.model_json_schema()
+
+
+class TextClassificationExample(BaseModel):
+    input_text: str
+    label: str
+    misleading_label: str
+
+
+class TextClassificationExamples(BaseModel):
+    examples: list[TextClassificationExample]
+
+
+TEXTCAT_EXAMPLES_SCHEMA = TextClassificationExamples.model_json_schema()
+
+
+class BatchedGenerateTextClassificationData(GenerateTextClassificationData):
+    """`GenerateTextClassificationData` that asks the `LLM` for `examples_per_prompt`
+    examples in a single prompt, instead of sending one request per example, and splits
+    the returned JSON list into one row per task."""
+
+    examples_per_prompt: PositiveInt = 1
+
+    def _format_batch(self, inputs: List[dict]) -> List[dict]:
+        return [
+            {
+                "role": "user",
+                "content": BATCHED_TEXTCAT_PROMPT.render(
+                    # NOTE: sampled per task, as the unbatched task does per example
+                    tasks=[
+                        {
+                            "task": input["task"],
+                            "difficulty": self.difficulty
+                            or random.choice(["high school", "college", "PhD"]),
+                            "clarity": self.clarity
+                            or random.choice(
+                                [
+                                    "clear",
+                                    "understandable with some effort",
+                                    "ambiguous",
+                                ]
+                            ),
+                        }
+                        for input in inputs
+                    ],
+                    language=self.language,
+                ).strip(),
+            }
+        ]
+
+    def _parse_examples(self, output: str | None) -> List[dict]:
+        if output is None:
+            return []
+        if match := _JSON_CODE_BLOCK_PATTERN.search(output):
+            output = match.group(1)
+        try:
+            examples = json.loads(output)["examples"]
+        except (TypeError, KeyError, json.JSONDecodeError):
+            return []
+        if not isinstance(examples, list):
+            return []
+        return [example for example in examples if isinstance(example, dict)]
+
+    def process(self, inputs: StepInput) -> StepOutput:
+        batches = [
+            inputs[i : i + self.examples_per_prompt]
+            for i in range(0, len(inputs), self.examples_per_prompt)
+        ]
+        formatted_inputs = [self._format_batch(batch) for batch in batches]
+        outputs = self.llm.generate_outputs(
+            inputs=formatted_inputs,
+            num_generations=1,
+            **self.llm.get_generation_kwargs(),
+        )
+
+        task_outputs = []
+        for batch, formatted_input, batch_outputs in zip(
+            batches, formatted_inputs, outputs
+        ):
+            examples = self._parse_examples(batch_outputs[0])
+            examples += [{}] * (len(batch) - len(examples))
+            metadata = {}
+            if self.add_raw_output:
+                metadata[f"raw_output_{self.name}"] = batch_outputs[0]
+            if self.add_raw_input:
+                metadata[f"raw_input_{self.name}"] = formatted_input
+            for input, example in zip(batch, examples):
+                task_output = {
+                    **input,
+                    **{key: example.get(key) for key in self.keys},
+                    "model_name": self.llm.model_name,
+                }
+                if metadata:
+                    task_output[DISTILABEL_METADATA_KEY] = dict(metadata)
+                task_outputs.append(task_output)
+        yield task_outputs
+
+
+class CachedTextClassification(TextClassification):
+    """`TextClassification` that only sends a text to the `LLM` once when it's repeated
+    within a batch. If `CACHE_DIR` is set, the labels assigned to each text are also
+    persisted in a sqlite database, for the same context and available labels. The
+    labeller runs with a near-zero temperature, so a cached response is as good as a
+    new one. Any error while using the database only emits a warning and falls back to
+    the `LLM`."""
+
+    _cache_path: Union[str, None] = PrivateAttr(default=None)
+
+    def load(self) -> None:
+        super().load()
+        if not _LABELS_CACHE_PATH:
+            return
+        try:
+            os.makedirs(CACHE_DIR, exist_ok=True)
+            with closing(sqlite3.connect(_LABELS_CACHE_PATH)) as connection, connection:
+                connection.execute(
+                    "CREATE TABLE IF NOT EXISTS labels (key TEXT PRIMARY KEY, value TEXT)"
+                )
+        except (OSError, sqlite3.Error) as e:
+            warnings.warn(f"Failed to create the labels cache, disabling it: {e}")
+            return
+        self._cache_path = _LABELS_CACHE_PATH
+
+    def _get_cache_key(self, input: dict) -> str:
+        key = json.dumps(
+            [
+                self.llm.model_name,
+                self.context,
+                sorted(self.available_labels),
+                self.n,
+                input["text"],
+            ]
+        )
+        return hashlib.blake2b(key.encode(), digest_size=16).hexdigest()
+
+    def _read_cache(self, keys: List[str]) -> dict:
+        if not self._cache_path or not keys:
+            return {}
+        placeholders = ", ".join("?" * len(keys))
+        try:
+            with closing(sqlite3.connect(self._cache_path)) as connection:
+                return {
+                    key: json.loads(value)
+                    for key, value in connection.execute(
+                        f"SELECT key, value FROM labels WHERE key IN ({placeholders})",
+                        keys,
+                    )
+                }
+        except sqlite3.Error as e:
+            warnings.warn(f"Failed to read from the labels cache: {e}")
+            return {}
+
+    def _write_cache(self, rows: List[tuple]) -> None:
+        if not self._cache_path or not rows:
+            return
+        try:
+            with closing(sqlite3.connect(self._cache_path)) as connection, connection:
+                connection.executemany(
+                    "INSERT OR REPLACE INTO labels (key, value) VALUES (?, ?)", rows
+                )
+        except sqlite3.Error as e:
+            warnings.warn(f"Failed to write to the labels cache: {e}")
+
+    def process(self, inputs: StepInput) -> StepOutput:
+        # NOTE: rows without text are neither cached nor deduplicated, so they are keyed
+        # by their position instead
+        keys = [
+            self._get_cache_key(input) if input["text"] is not None else i
+            for i, input in enumerate(inputs)
+        ]
+        cached = self._read_cache([key for key in keys if isinstance(key, str)])
+
+        misses = {}
+        for key, input in zip(keys, inputs):
+            if key not in cached and key not in misses:
+                misses[key] = input
+
+        generated = {}
+        if misses:
+            outputs = next(super().process(list(misses.values())))
+            generated = dict(zip(misses, outputs))
+            cached.update(
+                {
+                    key: {column: output[column] for column in self.outputs}
+                    for key, output in generated.items()
+                }
+            )
+            self._write_cache(
+                [
+                    (key, json.dumps(cached[key]))
+                    for key, output in generated.items()
+                    if isinstance(key, str) and output["labels"] is not None
+                ]
+            )
+
+        # the first occurrence of a text gets the row generated by the `LLM`, while the
+        # rest of them (and the cached ones) reuse its labels
+        outputs = []
+        for key, input in zip(keys, inputs):
+            if key in generated:
+                outputs.append(generated.pop(key))
+                continue
+            output = {**input, **cached[key]}
+            if self.add_raw_output or self.add_raw_input:
+                output.setdefault(DISTILABEL_METADATA_KEY, {})
+            outputs.append(output)
+        yield outputs
+
+
 def get_prompt_generator():
+    global _PROMPT_GENERATOR_WARMUP_PENDING
+    with _PROMPT_GENERATOR_WARMUP_LOCK:
+        if _PROMPT_GENERATOR_WARMUP_PENDING:
+            # the key being warmed up was already taken from the rotation
+            _PROMPT_GENERATOR_WARMUP_PENDING = False
+            api_key = _PROMPT_GENERATOR_WARMUP_API_KEY
+        else:
+            api_key = _get_next_api_key()
+
+    # NOTE: only the generator being warmed up is waited for, and a hung warm-up falls
+    # back to loading it again after the timeout
+    if (
+        _PROMPT_GENERATOR_WARMUP is not None
+        and api_key == _PROMPT_GENERATOR_WARMUP_API_KEY
+    ):
+        _PROMPT_GENERATOR_WARMUP.join(timeout=_PROMPT_GENERATOR_WARMUP_TIMEOUT)
+    return _get_prompt_generator(api_key=api_key)
+
+
+@lru_cache(maxsize=32)
+def _get_prompt_generator(api_key):
     structured_output = {
         "format": "json",
-        "schema": TextClassificationTask,
+        "schema": TEXTCAT_TASK_SCHEMA,
     }
     generation_kwargs = {
         "temperature": 0.8,
         "max_new_tokens": MAX_NUM_TOKENS,
     }
     if BASE_URL:
-        llm = OpenAILLM(
+        llm = PooledOpenAILLM(
             model=MODEL,
             base_url=BASE_URL,
-            api_key=_get_next_api_key(),
+            api_key=api_key,
             structured_output=structured_output,
             generation_kwargs=generation_kwargs,
         )
     else:
         generation_kwargs["do_sample"] = True
-        llm = InferenceEndpointsLLM(
-            api_key=_get_next_api_key(),
+        llm = SharedLoopInferenceEndpointsLLM(
+            api_key=api_key,
             model_id=MODEL,
             base_url=BASE_URL,
             structured_output=structured_output,
@@ -97,63 +479,130 @@ def get_prompt_generator():
     return prompt_generator
 
 
-def get_textcat_generator(difficulty, clarity, temperature, is_sample):
+def _warmup_prompt_generator(api_key):
+    try:
+        _get_prompt_generator(api_key=api_key)
+    except Exception as e:
+        warnings.warn(f"Failed to warm up the prompt generator: {e}")
+
+
+def warmup_prompt_generator():
+    """Loads the prompt generator for the next API key in a daemon thread, as loading it
+    fetches the model status and tokenizer. It's started once the app is loaded, so
+    that it runs while the user is still writing the dataset description."""
+    global _PROMPT_GENERATOR_WARMUP
+    global _PROMPT_GENERATOR_WARMUP_API_KEY
+    global _PROMPT_GENERATOR_WARMUP_PENDING
+    with _PROMPT_GENERATOR_WARMUP_LOCK:
+        if _PROMPT_GENERATOR_WARMUP is None:
+            _PROMPT_GENERATOR_WARMUP_API_KEY = _get_next_api_key()
+            _PROMPT_GENERATOR_WARMUP_PENDING = True
+            _PROMPT_GENERATOR_WARMUP = threading.Thread(
+                target=_warmup_prompt_generator,
+                args=(_PROMPT_GENERATOR_WARMUP_API_KEY,),
+                name="prompt-generator-warmup",
+                daemon=True,
+            )
+            _PROMPT_GENERATOR_WARMUP.start()
+
+
+def get_textcat_generator(
+    difficulty, clarity, temperature, is_sample, examples_per_prompt=1
+):
+    return _get_textcat_generator(
+        difficulty=difficulty,
+        clarity=clarity,
+        temperature=temperature,
+        is_sample=is_sample,
+        examples_per_prompt=examples_per_prompt,
+        api_key=_get_next_api_key(),
+    )
+
+
+@lru_cache(maxsize=32)
+def _get_textcat_generator(
+    difficulty, clarity, temperature, is_sample, examples_per_prompt, api_key
+):
     generation_kwargs = {
         "temperature": temperature,
-        "max_new_tokens": 256 if is_sample else MAX_NUM_TOKENS,
+        "max_new_tokens": 256 * examples_per_prompt if is_sample else MAX_NUM_TOKENS,
         "top_p": 0.95,
     }
     if BASE_URL:
-        llm = OpenAILLM(
+        llm = PooledOpenAILLM(
             model=MODEL,
             base_url=BASE_URL,
-            api_key=_get_next_api_key(),
+            api_key=api_key,
             generation_kwargs=generation_kwargs,
         )
     else:
         generation_kwargs["do_sample"] = True
-        llm = InferenceEndpointsLLM(
+        llm = SharedLoopInferenceEndpointsLLM(
             model_id=MODEL,
             base_url=BASE_URL,
-            api_key=_get_next_api_key(),
+            api_key=api_key,
+            structured_output=(
+                {"format": "json", "schema": TEXTCAT_EXAMPLES_SCHEMA}
+                if examples_per_prompt > 1
+                else None
+            ),
             generation_kwargs=generation_kwargs,
         )
 
-    textcat_generator = GenerateTextClassificationData(
-        llm=llm,
-        difficulty=None if difficulty == "mixed" else difficulty,
-        clarity=None if clarity == "mixed" else clarity,
-        seed=random.randint(0, 2**32 - 1),
-    )
+    if examples_per_prompt > 1:
+        textcat_generator = BatchedGenerateTextClassificationData(
+            llm=llm,
+            difficulty=None if difficulty == "mixed" else difficulty,
+            clarity=None if clarity == "mixed" else clarity,
+            seed=random.getrandbits(32),
+            examples_per_prompt=examples_per_prompt,
+        )
+    else:
+        textcat_generator = GenerateTextClassificationData(
+            llm=llm,
+            difficulty=None if difficulty == "mixed" else difficulty,
+            clarity=None if clarity == "mixed" else clarity,
+            seed=random.getrandbits(32),
+        )
     textcat_generator.load()
     return textcat_generator
 
 
 def get_labeller_generator(system_prompt, labels, multi_label):
+    return _get_labeller_generator(
+        system_prompt=system_prompt,
+        labels=tuple(labels),
+        multi_label=multi_label,
+        api_key=_get_next_api_key(),
+    )
+
+
+@lru_cache(maxsize=32)
+def _get_labeller_generator(system_prompt, labels, multi_label, api_key):
     generation_kwargs = {
         "temperature": 0.01,
         "max_new_tokens": MAX_NUM_TOKENS,
     }
 
     if BASE_URL:
-        llm = OpenAILLM(
+        llm = PooledOpenAILLM(
             model=MODEL,
             base_url=BASE_URL,
-            api_key=_get_next_api_key(),
+            api_key=api_key,
             generation_kwargs=generation_kwargs,
         )
     else:
-        llm = InferenceEndpointsLLM(
+        llm = SharedLoopInferenceEndpointsLLM(
             model_id=MODEL,
             base_url=BASE_URL,
-            api_key=_get_next_api_key(),
+            api_key=api_key,
             generation_kwargs=generation_kwargs,
         )
 
-    labeller_generator = TextClassification(
+    labeller_generator = CachedTextClassification(
         llm=llm,
         context=system_prompt,
-        available_labels=labels,
+        available_labels=list(labels),
         n=len(labels) if multi_label else 1,
         default_label="unknown",
     )
@@ -170,91 +619,35 @@ def generate_pipeline_code(
     num_rows: int = 10,
     temperature: float = 0.9,
 ) -> str:
-    labels = get_preprocess_labels(labels)
-    MODEL_ARG = "model_id" if BASE_URL else "model"
-    MODEL_CLASS = "InferenceEndpointsLLM" if BASE_URL else "OpenAILLM"
-    base_code = f"""
-# Requirements: `pip install distilabel[hf-inference-endpoints]`
-import os
-import random
-from distilabel.llms import InferenceEndpointsLLM
-from distilabel.pipeline import Pipeline
-from distilabel.steps import LoadDataFromDicts, KeepColumns
-from distilabel.steps.tasks import {"GenerateTextClassificationData" if num_labels == 1 else "GenerateTextClassificationData, TextClassification"}
-
-MODEL = "{MODEL}"
-BASE_URL = "{BASE_URL}"
-TEXT_CLASSIFICATION_TASK = "{system_prompt}"
-os.environ["API_KEY"] = (
-    "hf_xxx"  # https://huggingface.co/settings/tokens/new?ownUserPermissions=repo.content.read&ownUserPermissions=repo.write&globalPermissions=inference.serverless.write&canReadGatedRepos=true&tokenType=fineGrained
-)
-
-with Pipeline(name="textcat") as pipeline:
-
-    task_generator = LoadDataFromDicts(data=[{{"task": TEXT_CLASSIFICATION_TASK}}])
-
-    textcat_generation = GenerateTextClassificationData(
-        llm={MODEL_CLASS}(
-            {MODEL_ARG}=MODEL,
-            base_url=BASE_URL,
-            api_key=os.environ["API_KEY"],
-            generation_kwargs={{
-                "temperature": {temperature},
-                "max_new_tokens": {MAX_NUM_TOKENS},
-                "top_p": 0.95,
-            }},
-        ),
-        seed=random.randint(0, 2**32 - 1),
-        difficulty={None if difficulty == "mixed" else repr(difficulty)},
-        clarity={None if clarity == "mixed" else repr(clarity)},
-        num_generations={num_rows},
-        output_mappings={{"input_text": "text"}},
-    )
-    """
-
-    if num_labels == 1:
-        return (
-            base_code
-            + """
-    keep_columns = KeepColumns(
-        columns=["text", "label"],
+    return _generate_pipeline_code(
+        system_prompt=system_prompt,
+        difficulty=difficulty,
+        clarity=clarity,
+        labels=tuple(get_preprocess_labels(labels)),
+        num_labels=num_labels,
+        num_rows=num_rows,
+        temperature=temperature,
     )
 
-    # Connect steps in the pipeline
-    task_generator >> textcat_generation >> keep_columns
 
-    if __name__ == "__main__":
-        distiset = pipeline.run()
-    """
-        )
-
-    return (
-        base_code
-        + f"""
-    keep_columns = KeepColumns(
-        columns=["text"],
+@lru_cache(maxsize=128)
+def _generate_pipeline_code(
+    system_prompt, difficulty, clarity, labels, num_labels, num_rows, temperature
+):
+    template = (
+        SINGLE_LABEL_PIPELINE_CODE_TEMPLATE
+        if num_labels == 1
+        else MULTI_LABEL_PIPELINE_CODE_TEMPLATE
     )
-
-    textcat_labeller = TextClassification(
-        llm={MODEL_CLASS}(
-            {MODEL_ARG}=MODEL,
-            base_url=BASE_URL,
-            api_key=os.environ["API_KEY"],
-            generation_kwargs={{
-                "temperature": 0.8,
-                "max_new_tokens": {MAX_NUM_TOKENS},
-            }},
-        ),
-        n={num_labels},
-        available_labels={labels},
-        context=TEXT_CLASSIFICATION_TASK,
-        default_label="unknown"
-    )
-
-    # Connect steps in the pipeline
-    task_generator >> textcat_generation >> keep_columns >> textcat_labeller
-
-    if __name__ == "__main__":
-        distiset = pipeline.run()
-    """
+    return template.render(
+        MODEL_ARG=_PIPELINE_CODE_MODEL_ARG,
+        MODEL_CLASS=_PIPELINE_CODE_MODEL_CLASS,
+        MAX_NUM_TOKENS=MAX_NUM_TOKENS,
+        system_prompt=system_prompt,
+        difficulty=None if difficulty == "mixed" else repr(difficulty),
+        clarity=None if clarity == "mixed" else repr(clarity),
+        labels=list(labels),
+        num_labels=num_labels,
+        num_rows=num_rows,
+        temperature=temperature,
     )
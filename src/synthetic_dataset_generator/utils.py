@@ -1,6 +1,7 @@
 import json
 import warnings
-from typing import List, Optional, Union
+from functools import lru_cache
+from typing import List, Optional, Tuple, Union
 
 import argilla as rg
 import gradio as gr
@@ -81,7 +82,12 @@ def get_argilla_client() -> Union[rg.Argilla, None]:
 
 
 def get_preprocess_labels(labels: Optional[List[str]]) -> List[str]:
-    return list(set([label.lower().strip() for label in labels])) if labels else []
+    return list(_preprocess_labels(tuple(labels))) if labels else []
+
+
+@lru_cache(maxsize=256)
+def _preprocess_labels(labels: Tuple[str, ...]) -> Tuple[str, ...]:
+    return tuple(set([label.lower().strip() for label in labels]))
 
 
 def column_to_list(dataframe: pd.DataFrame, column_name: str) -> List[str]:
@@ -0,0 +1,38 @@
+import os
+from typing import Any, Callable, List
+
+import pytest
+from pydantic import PrivateAttr
+
+os.environ.setdefault("HF_TOKEN", "hf_test")
+
+from distilabel.llms.base import AsyncLLM  # noqa: E402
+
+
+class StubLLM(AsyncLLM):
+    """`AsyncLLM` that answers every input with `respond(input)` and records the inputs
+    it received, so that no request is sent to an API."""
+
+    respond: Callable[[Any], Any]
+    structured_output: Any = None
+
+    _inputs: List[Any] = PrivateAttr(default_factory=list)
+
+    def load(self) -> None:
+        pass
+
+    @property
+    def model_name(self) -> str:
+        return "stub"
+
+    async def agenerate(self, input, num_generations=1, **kwargs):
+        self._inputs.append(input)
+        return [self.respond(input)]
+
+
+@pytest.fixture
+def stub_llm():
+    def _stub_llm(respond):
+        return StubLLM(respond=respond)
+
+    return _stub_llm
@@ -0,0 +1,183 @@
+import json
+
+import pytest
+from distilabel.constants import DISTILABEL_METADATA_KEY
+
+from synthetic_dataset_generator.pipelines import textcat
+from synthetic_dataset_generator.pipelines.textcat import (
+    BatchedGenerateTextClassificationData,
+    CachedTextClassification,
+)
+
+TASKS = [{"task": f"Task {i}"} for i in range(3)]
+
+
+def _example(i):
+    return {
+        "input_text": f"text {i}",
+        "label": f"label {i}",
+        "misleading_label": f"misleading {i}",
+    }
+
+
+def _batched_generator(llm, examples_per_prompt=3):
+    generator = BatchedGenerateTextClassificationData(
+        llm=llm, examples_per_prompt=examples_per_prompt, seed=42
+    )
+    generator.load()
+    return generator
+
+
+def test_batched_generator_splits_examples(stub_llm):
+    llm = stub_llm(lambda _: json.dumps({"examples": [_example(i) for i in range(3)]}))
+
+    rows = next(_batched_generator(llm).process(TASKS))
+
+    assert len(llm._inputs) == 1
+    assert [row["task"] for row in rows] == ["Task 0", "Task 1", "Task 2"]
+    assert [row["input_text"] for row in rows] == ["text 0", "text 1", "text 2"]
+    assert [row["label"] for row in rows] == ["label 0", "label 1", "label 2"]
+
+
+def test_batched_generator_parses_fenced_reply(stub_llm):
+    reply = json.dumps({"examples": [_example(i) for i in range(3)]})
+    llm = stub_llm(lambda _: f"```json\n{reply}\n```")
+
+    rows = next(_batched_generator(llm).process(TASKS))
+
+    assert [row["input_text"] for row in rows] == ["text 0", "text 1", "text 2"]
+
+
+def test_batched_generator_pads_missing_examples(stub_llm):
+    llm = stub_llm(lambda _: json.dumps({"examples": [_example(0)]}))
+
+    rows = next(_batched_generator(llm).process(TASKS))
+
+    assert [row["input_text"] for row in rows] == ["text 0", None, None]
+    assert [row["task"] for row in rows] == ["Task 0", "Task 1", "Task 2"]
+
+
+def test_batched_generator_drops_extra_examples(stub_llm):
+    llm = stub_llm(lambda _: json.dumps({"examples": [_example(i) for i in range(5)]}))
+
+    rows = next(_batched_generator(llm).process(TASKS))
+
+    assert [row["input_text"] for row in rows] == ["text 0", "text 1", "text 2"]
+
+
+def test_batched_generator_handles_invalid_replies(stub_llm):
+    for reply in [None, "not json", json.dumps({"examples": 3}), json.dumps([1])]:
+        llm = stub_llm(lambda _, reply=reply: reply)
+
+        rows = next(_batched_generator(llm).process(TASKS))
+
+        assert len(rows) == 3
+        assert all(row["input_text"] is None for row in rows)
+
+
+def test_batched_generator_adds_metadata(stub_llm):
+    reply = json.dumps({"examples": [_example(0), _example(1)]})
+    llm = stub_llm(lambda _: reply)
+    generator = _batched_generator(llm, examples_per_prompt=2)
+
+    rows = next(generator.process(TASKS))
+
+    assert len(llm._inputs) == 2
+    assert all(set(row) == set(rows[0]) for row in rows)
+    assert rows[0][DISTILABEL_METADATA_KEY] == {
+        f"raw_output_{generator.name}": reply,
+        f"raw_input_{generator.name}": llm._inputs[0],
+    }
+
+
+def test_batched_generator_samples_difficulty_and_clarity_per_task(stub_llm):
+    llm = stub_llm(lambda _: None)
+    generator = _batched_generator(llm, examples_per_prompt=30)
+
+    prompt = generator._format_batch([{"task": "Task"}] * 30)[0]["content"]
+
+    assert prompt.count('The "input_text" is') == 30
+    assert len({line for line in prompt.splitlines() if "level education" in line}) > 1
+
+
+def _labeller(llm, **kwargs):
+    labeller = CachedTextClassification(
+        llm=llm,
+        available_labels=["positive", "negative"],
+        default_label="unknown",
+        use_default_structured_output=False,
+        **kwargs,
+    )
+    labeller.load()
+    return labeller
+
+
+def _label_by_text(input):
+    text = input[-1]["content"]
+    return json.dumps({"labels": "negative" if "bad" in text else "positive"})
+
+
+def test_labeller_sends_repeated_texts_once(stub_llm):
+    llm = stub_llm(_label_by_text)
+    inputs = [
+        {"text": "good", "id": 0},
+        {"text": "bad", "id": 1},
+        {"text": "good", "id": 2},
+        {"text": "bad", "id": 3},
+    ]
+
+    rows = next(_labeller(llm).process(inputs))
+
+    assert len(llm._inputs) == 2
+    assert [row["id"] for row in rows] == [0, 1, 2, 3]
+    assert [row["labels"] for row in rows] == [
+        "positive",
+        "negative",
+        "positive",
+        "negative",
+    ]
+    assert all(set(row) == set(rows[0]) for row in rows)
+
+
+def test_labeller_does_not_deduplicate_missing_texts(stub_llm):
+    llm = stub_llm(_label_by_text)
+
+    rows = next(_labeller(llm).process([{"text": None}, {"text": None}]))
+
+    assert len(llm._inputs) == 2
+    assert len(rows) == 2
+
+
+def test_labeller_without_cache_dir_does_not_persist_labels(stub_llm):
+    llm = stub_llm(_label_by_text)
+    labeller = _labeller(llm)
+
+    next(labeller.process([{"text": "good"}]))
+    next(labeller.process([{"text": "good"}]))
+
+    assert len(llm._inputs) == 2
+
+
+def test_labeller_serves_cached_labels(stub_llm, tmp_path, monkeypatch):
+    monkeypatch.setattr(textcat, "CACHE_DIR", str(tmp_path))
+    monkeypatch.setattr(textcat, "_LABELS_CACHE_PATH", str(tmp_path / "textcat.db"))
+    llm = stub_llm(_label_by_text)
+
+    generated = next(_labeller(llm).process([{"text": "good"}]))
+    cached = next(_labeller(llm).process([{"text": "good"}, {"text": "bad"}]))
+
+    assert len(llm._inputs) == 2
+    assert [row["labels"] for row in cached] == ["positive", "negative"]
+    assert set(cached[0]) == set(generated[0]) == set(cached[1])
+
+
+def test_labeller_falls_back_to_llm_when_cache_fails(stub_llm, tmp_path, monkeypatch):
+    monkeypatch.setattr(textcat, "CACHE_DIR", str(tmp_path))
+    monkeypatch.setattr(textcat, "_LABELS_CACHE_PATH", str(tmp_path))
+    llm = stub_llm(_label_by_text)
+
+    with pytest.warns(UserWarning, match="labels cache"):
+        labeller = _labeller(llm)
+    rows = next(labeller.process([{"text": "good"}]))
+
+    assert rows[0]["labels"] == "positive"